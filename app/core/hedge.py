@@ -0,0 +1,457 @@
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, fields, replace
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+def percentile(samples: Iterable[float], q: float) -> Optional[float]:
+    """
+    Computes the nearest-rank percentile of a set of samples.
+
+    Args:
+        samples (Iterable[float]): The observed values.
+        q (float): The percentile to compute, as a fraction between 0 and 1.
+
+    Returns:
+        Optional[float]: The percentile value, or None if there are no samples.
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LatencyWindow:
+    """
+    Thread-safe rolling window of latency samples, in seconds.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------------------------
+    def add(self, value: float) -> None:
+        with self._lock:
+            self._samples.append(value)
+
+    # ----------------------------------------------------------------------
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            return percentile(self._samples, q)
+
+    # ----------------------------------------------------------------------
+    def values(self) -> List[float]:
+        with self._lock:
+            return list(self._samples)
+
+    # ----------------------------------------------------------------------
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+
+@dataclass
+class HedgePolicy:
+    """
+    Controls when and how often duplicate (hedged) requests are sent to an upstream.
+
+    Attributes:
+        enabled (bool): Whether hedging is active for the upstream.
+        percentile (float): Latency percentile after which a hedge is sent (e.g. 0.95).
+        min_samples (int): Samples required before the percentile is trusted.
+        initial_delay (float): Hedge delay in seconds used until enough samples exist.
+        min_delay (float): Lower bound on the hedge delay in seconds.
+        max_delay (float): Upper bound on the hedge delay in seconds.
+        max_hedges (int): Maximum number of duplicate requests per call.
+        budget_ratio (float): Hedges earned per primary call; caps extra load at this fraction.
+        budget_burst (float): Maximum number of hedges that can be saved up.
+        max_hedges_in_flight (int): Hedges that may run at once against the upstream;
+            no more are sent while it is reached. Primaries are not limited.
+        window (int): Number of latency samples kept for the percentile estimate.
+    """
+    enabled: bool = False
+    percentile: float = 0.95
+    min_samples: int = 20
+    initial_delay: float = 2.0
+    min_delay: float = 0.05
+    max_delay: float = 30.0
+    max_hedges: int = 1
+    budget_ratio: float = 0.1
+    budget_burst: float = 5.0
+    max_hedges_in_flight: int = 8
+    window: int = 200
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def from_env(cls, prefix: str = "HEDGE", base: Optional['HedgePolicy'] = None) -> 'HedgePolicy':
+        """
+        Builds a policy from environment variables such as HEDGE_ENABLED or HEDGE_PERCENTILE.
+
+        Args:
+            prefix (str): The environment variable prefix.
+            base (Optional[HedgePolicy]): Policy supplying values for unset variables.
+
+        Returns:
+            HedgePolicy: The resulting policy.
+        """
+        policy = base or cls()
+        overrides = {}
+        for field in fields(cls):
+            raw = os.getenv(f"{prefix}_{field.name.upper()}")
+            if raw is None:
+                continue
+            if field.type in (bool, 'bool'):
+                overrides[field.name] = raw.strip().lower() in ("1", "true", "yes", "on")
+            elif field.type in (int, 'int'):
+                overrides[field.name] = int(raw)
+            else:
+                overrides[field.name] = float(raw)
+        return replace(policy, **overrides)
+
+
+class HedgeBudget:
+    """
+    Token bucket limiting hedges to a fraction of primary calls, so hedging
+    cannot amplify load on a slow upstream.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------------------------
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    # ----------------------------------------------------------------------
+    def refund(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    # ----------------------------------------------------------------------
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class HedgeMetrics:
+    """
+    Per-upstream counters comparing hedged latency against what the primary
+    request alone would have delivered.
+
+    Primaries beaten by a hedge are usually still running; until they finish,
+    their elapsed time is counted as a lower bound on their latency.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, window: int):
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+        self.saturated = 0
+        self.failures = 0
+        self.primary = LatencyWindow(window)
+        self.observed = LatencyWindow(window)
+        self._running: Dict[int, List] = {}
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------------------------
+    def count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    # ----------------------------------------------------------------------
+    def start_primary(self, key: int, start: float) -> None:
+        with self._lock:
+            self._running[key] = [start, False]
+
+    # ----------------------------------------------------------------------
+    def answer(self, key: int) -> None:
+        with self._lock:
+            if key in self._running:
+                self._running[key][1] = True
+
+    # ----------------------------------------------------------------------
+    def finish_primary(self, key: int, latency: Optional[float]) -> None:
+        with self._lock:
+            self._running.pop(key, None)
+        if latency is not None:
+            self.primary.add(latency)
+
+    # ----------------------------------------------------------------------
+    def snapshot(self) -> dict:
+        """
+        Returns the metrics as a dictionary.
+
+        Returns:
+            dict: Call counts, extra upstream call ratio and p99 latency with and without hedging.
+        """
+        with self._lock:
+            data = {
+                'calls': self.calls,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'budget_denied': self.budget_denied,
+                'saturated': self.saturated,
+                'failures': self.failures,
+                'extra_call_ratio': self.hedges / self.calls if self.calls else 0.0,
+            }
+            now = time.monotonic()
+            abandoned = [now - start for start, answered in self._running.values() if answered]
+        data['abandoned_primaries'] = len(abandoned)
+        primary_p99 = percentile(self.primary.values() + abandoned, 0.99)
+        observed_p99 = self.observed.percentile(0.99)
+        data['primary_p99'] = primary_p99
+        data['observed_p99'] = observed_p99
+        data['p99_saved'] = (
+            primary_p99 - observed_p99 if primary_p99 is not None and observed_p99 is not None else None
+        )
+        return data
+
+
+class _Upstream:
+    """
+    Latency history, budget, metrics and hedge thread pool for a single upstream.
+    Each upstream has its own pool so hung hedges to one cannot starve another.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, name: str, policy: HedgePolicy):
+        self.policy = policy
+        self.latency = LatencyWindow(policy.window)
+        self.budget = HedgeBudget(policy.budget_ratio, policy.budget_burst)
+        self.metrics = HedgeMetrics(policy.window)
+        self.name = name
+        self.executor = ThreadPoolExecutor(policy.max_hedges_in_flight, thread_name_prefix=f"hedge-{name}")
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------------------------
+    def start(self, fn: Callable[..., T], *args: Any) -> Future:
+        """Runs a primary attempt on its own thread, outside the hedge pool."""
+        future: Future = Future()
+
+        def run() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"primary-{self.name}", daemon=True).start()
+        return future
+
+    # ----------------------------------------------------------------------
+    def submit(self, fn: Callable[..., T], *args: Any) -> Future:
+        """Runs a hedge attempt in the upstream's bounded pool."""
+        with self._lock:
+            self._in_flight += 1
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    # ----------------------------------------------------------------------
+    def saturated(self) -> bool:
+        with self._lock:
+            return self._in_flight >= self.policy.max_hedges_in_flight
+
+    # ----------------------------------------------------------------------
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    # ----------------------------------------------------------------------
+    def delay(self) -> float:
+        policy = self.policy
+        estimate = None
+        if len(self.latency) >= policy.min_samples:
+            estimate = self.latency.percentile(policy.percentile)
+        if estimate is None:
+            estimate = policy.initial_delay
+        return min(policy.max_delay, max(policy.min_delay, estimate))
+
+
+class Hedger:
+    """
+    Hedger sends a duplicate request to an upstream when the first one is slower
+    than the upstream's recent p95 latency, and returns whichever answers first.
+
+    Requests already running cannot be interrupted, so losing attempts are left
+    to finish in the background; their latency still feeds the estimates. Upstream
+    calls should therefore carry their own timeout.
+
+    Attributes:
+        default_policy (HedgePolicy): Policy for upstreams without their own policy.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, default_policy: Optional[HedgePolicy] = None,
+                 policies: Optional[Dict[str, HedgePolicy]] = None):
+        """
+        Initializes the Hedger.
+
+        Args:
+            default_policy (Optional[HedgePolicy]): Policy for upstreams without their own policy.
+            policies (Optional[Dict[str, HedgePolicy]]): Per-upstream policies.
+        """
+        self.default_policy = default_policy or HedgePolicy()
+        self._policies: Dict[str, HedgePolicy] = dict(policies or {})
+        self._upstreams: Dict[str, _Upstream] = {}
+        self._lock = threading.Lock()
+        self._keys = itertools.count()
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def from_env(cls, upstreams: Iterable[str] = ()) -> 'Hedger':
+        """
+        Builds a Hedger from HEDGE_* environment variables. Each upstream may
+        override them with HEDGE_<UPSTREAM>_* variables.
+
+        Args:
+            upstreams (Iterable[str]): Upstream names that may have their own policy.
+
+        Returns:
+            Hedger: The configured instance.
+        """
+        default_policy = HedgePolicy.from_env()
+        policies = {
+            name: HedgePolicy.from_env(f"HEDGE_{name.upper()}", default_policy)
+            for name in upstreams
+        }
+        return cls(default_policy, policies)
+
+    # ----------------------------------------------------------------------
+    def set_policy(self, upstream: str, policy: HedgePolicy) -> None:
+        """
+        Sets the policy for an upstream, resetting its history and metrics.
+        Attempts already running against the old policy are left to finish.
+
+        Args:
+            upstream (str): The upstream name.
+            policy (HedgePolicy): The policy to apply.
+        """
+        with self._lock:
+            self._policies[upstream] = policy
+            self._upstreams.pop(upstream, None)
+
+    # ----------------------------------------------------------------------
+    def call(self, upstream: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Calls fn, hedging it according to the upstream's policy.
+
+        Args:
+            upstream (str): The upstream name used for policy, budget and metrics.
+            fn (Callable[..., T]): The upstream call. It must be safe to issue twice.
+            *args: Positional arguments for fn.
+            **kwargs: Keyword arguments for fn.
+
+        Returns:
+            T: The result of the first attempt to succeed.
+
+        Raises:
+            Exception: The last error if every attempt failed.
+        """
+        state = self._upstream(upstream)
+        policy = state.policy
+        if not policy.enabled:
+            return fn(*args, **kwargs)
+
+        state.budget.deposit()
+        state.metrics.count('calls')
+        start = time.monotonic()
+        key = next(self._keys)
+        state.metrics.start_primary(key, start)
+
+        def attempt(primary: bool) -> T:
+            began = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                if primary:
+                    state.metrics.finish_primary(key, None)
+                raise
+            state.latency.add(time.monotonic() - began)
+            if primary:
+                state.metrics.finish_primary(key, time.monotonic() - start)
+            return result
+
+        primary_future = state.start(attempt, True)
+        pending = {primary_future}
+        hedges = 0
+        error: Optional[BaseException] = None
+
+        while pending:
+            timeout = state.delay() if hedges < policy.max_hedges else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                if state.saturated():
+                    hedges = policy.max_hedges
+                    state.metrics.count('saturated')
+                elif state.budget.withdraw():
+                    hedges += 1
+                    state.metrics.count('hedges')
+                    logging.info(f"[{upstream}] Sending hedged request #{hedges}")
+                    pending.add(state.submit(attempt, False))
+                else:
+                    hedges = policy.max_hedges
+                    state.metrics.count('budget_denied')
+                continue
+
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                for other in pending:
+                    other.cancel()
+                state.metrics.answer(key)
+                state.metrics.observed.add(time.monotonic() - start)
+                if future is not primary_future:
+                    state.metrics.count('hedge_wins')
+                return result
+
+        state.metrics.count('failures')
+        raise error
+
+    # ----------------------------------------------------------------------
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Returns the hedging metrics of every upstream seen so far.
+
+        Returns:
+            Dict[str, dict]: Metrics keyed by upstream name.
+        """
+        with self._lock:
+            upstreams = dict(self._upstreams)
+        return {name: state.metrics.snapshot() for name, state in upstreams.items()}
+
+    # ----------------------------------------------------------------------
+    def _upstream(self, upstream: str) -> _Upstream:
+        with self._lock:
+            state = self._upstreams.get(upstream)
+            if state is None:
+                state = _Upstream(upstream, self._policies.get(upstream, self.default_policy))
+                self._upstreams[upstream] = state
+            return state
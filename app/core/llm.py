@@ -1,11 +1,23 @@
 import os
+from typing import Optional
+
 import requests
 
+from core.hedge import Hedger
+
 class OpenfabricClient:
-    def __init__(self):
-        """Initialize the Openfabric client."""
+    def __init__(self, hedger: Optional[Hedger] = None):
+        """Initialize the Openfabric client.
+
+        Args:
+            hedger (Optional[Hedger]): Hedging policies and metrics for the
+                "text_to_image" and "image_to_3d" upstreams (default: from env)
+        """
         self.text_to_image_app_id = os.getenv("TEXT_TO_IMAGE_APP_ID")
         self.image_to_3d_app_id = os.getenv("IMAGE_TO_3D_APP_ID")
+        # Bound each upstream request so abandoned hedged attempts free their threads
+        self.timeout = float(os.getenv("OPENFABRIC_TIMEOUT", "120"))
+        self.hedger = hedger or Hedger.from_env(["text_to_image", "image_to_3d"])
         # self.api_key = os.getenv("OPENFABRIC_API_KEY")
         # self.base_url = "https://api.openfabric.network/v1/apps"
 
@@ -18,12 +30,16 @@ class OpenfabricClient:
         Returns:
             str: URL of the generated image
         """
+        return self.hedger.call("text_to_image", self._generate_image, prompt)
+
+    def _generate_image(self, prompt: str) -> str:
         headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
         data = {"prompt": prompt}
         response = requests.post(
             f"{self.base_url}/{self.text_to_image_app_id}/generate",
             headers=headers,
-            json=data
+            json=data,
+            timeout=self.timeout
         )
         return response.json().get("image_url")
     
@@ -36,12 +52,16 @@ class OpenfabricClient:
         Returns:
             str: URL of the generated 3D model
         """
+        return self.hedger.call("image_to_3d", self._generate_3d_model, image_url)
+
+    def _generate_3d_model(self, image_url: str) -> str:
         headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
         data = {"image_url": image_url}
         response = requests.post(
             f"{self.base_url}/{self.image_to_3d_app_id}/generate",
             headers=headers,
-            json=data
+            json=data,
+            timeout=self.timeout
         )
         return response.json().get("model_url")
 
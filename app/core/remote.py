@@ -1,3 +1,4 @@
+import time
 from typing import Optional, Union
 
 from openfabric_pysdk.helper import Proxy
@@ -59,23 +60,35 @@ class Remote:
 
     # ----------------------------------------------------------------------
     @staticmethod
-    def get_response(output: ExecutionResult) -> Union[dict, None]:
+    def get_response(output: ExecutionResult, timeout: Optional[float] = None,
+                     poll_interval: float = 0.5) -> Union[dict, None]:
         """
         Waits for the result and processes the output.
 
         Args:
             output (ExecutionResult): The result returned from a proxy request.
+            timeout (Optional[float]): Seconds to wait for the result, or None to wait indefinitely.
+            poll_interval (float): Seconds between status checks while a timeout is set.
 
         Returns:
             Union[dict, None]: The response data if successful, None otherwise.
 
         Raises:
             Exception: If the request failed or was cancelled.
+            TimeoutError: If the result did not arrive within the timeout.
         """
         if output is None:
             return None
 
-        output.wait()
+        if timeout is None:
+            output.wait()
+        else:
+            deadline = time.monotonic() + timeout
+            while str(output.status()).lower() not in ("completed", "cancelled", "failed"):
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"The request to the proxy app timed out after {timeout}s!")
+                time.sleep(poll_interval)
+
         status = str(output.status()).lower()
         if status == "completed":
             return output.data()
@@ -0,0 +1,237 @@
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Optional, Tuple, TypeVar
+
+from core.hedge import HedgeBudget, LatencyWindow
+
+T = TypeVar('T')
+
+
+# Words that carry no visual content, ignored when comparing prompts
+STOP_WORDS = frozenset("""
+a an the and or but of in on at to for from with by as is are be this that these those
+it its into onto over under very some any all each""".split())
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalizes a prompt for exact comparison by lowercasing it and collapsing whitespace.
+
+    Args:
+        prompt (str): The prompt to normalize.
+
+    Returns:
+        str: The normalized prompt.
+    """
+    return " ".join(prompt.lower().split())
+
+
+def content_words(prompt: str) -> FrozenSet[str]:
+    """
+    Extracts the words of a prompt that describe its content, ignoring case,
+    punctuation and stop words.
+
+    Args:
+        prompt (str): The prompt to analyse.
+
+    Returns:
+        FrozenSet[str]: The content words.
+    """
+    return frozenset(re.findall(r"[a-z0-9']+", prompt.lower())) - STOP_WORDS
+
+
+@dataclass
+class SpeculationPolicy:
+    """
+    Controls speculative generation while the prompt is still being enhanced.
+
+    Attributes:
+        enabled (bool): Whether speculative generation is active.
+        budget_ratio (float): Speculative calls earned per request; caps extra load at this fraction.
+        budget_burst (float): Maximum number of speculative calls that can be saved up.
+    """
+    enabled: bool = False
+    budget_ratio: float = 0.2
+    budget_burst: float = 5.0
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def from_env(cls, prefix: str = "SPECULATIVE") -> 'SpeculationPolicy':
+        """
+        Builds a policy from environment variables such as SPECULATIVE_ENABLED.
+
+        Args:
+            prefix (str): The environment variable prefix.
+
+        Returns:
+            SpeculationPolicy: The resulting policy.
+        """
+        def flag(name: str, default: bool) -> bool:
+            raw = os.getenv(f"{prefix}_{name}")
+            return default if raw is None else raw.strip().lower() in ("1", "true", "yes", "on")
+
+        def number(name: str, default: float) -> float:
+            return float(os.getenv(f"{prefix}_{name}", default))
+
+        return cls(
+            enabled=flag("ENABLED", cls.enabled),
+            budget_ratio=number("BUDGET_RATIO", cls.budget_ratio),
+            budget_burst=number("BUDGET_BURST", cls.budget_burst),
+        )
+
+
+class Speculator:
+    """
+    Speculator starts generation on a guessed input while the real input is
+    still being resolved, then keeps the result if the guess has the same
+    content words as the real input, or discards it and generates again.
+
+    A speculative call that has already started cannot be interrupted, so a
+    miss costs one extra upstream call; it is counted in the metrics. Each
+    upstream has a token budget, refunded on hits, that bounds those calls.
+
+    Attributes:
+        policy (SpeculationPolicy): The active speculation policy.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self, policy: SpeculationPolicy, max_workers: int = 4, window: int = 200):
+        """
+        Initializes the Speculator.
+
+        Args:
+            policy (SpeculationPolicy): The speculation policy.
+            max_workers (int): Size of the thread pool running speculative calls.
+            window (int): Number of latency samples kept for the metrics.
+        """
+        self.policy = policy
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="speculate")
+        self._lock = threading.Lock()
+        self._budgets: Dict[str, HedgeBudget] = {}
+        self._runs = 0
+        self._hits = 0
+        self._misses = 0
+        self._skipped = 0
+        self._budget_denied = 0
+        self._wasted_calls = 0
+        self._serial = LatencyWindow(window)
+        self._observed = LatencyWindow(window)
+
+    # ----------------------------------------------------------------------
+    def run(self, upstream: str, guess: Optional[str], resolve: Callable[[], str],
+            generate: Callable[[str], T]) -> Tuple[str, T]:
+        """
+        Resolves the input and generates from it, speculating if the policy allows.
+
+        Args:
+            upstream (str): The upstream generate calls, used for budget accounting.
+            guess (Optional[str]): The input to speculate on, or None to not speculate.
+            resolve (Callable[[], str]): Returns the real input (e.g. the enhanced prompt).
+            generate (Callable[[str], T]): The generation call.
+
+        Returns:
+            Tuple[str, T]: The resolved input and the result generated for it.
+        """
+        if not self.policy.enabled:
+            value = resolve()
+            return value, generate(value)
+
+        budget = self._budget(upstream)
+        budget.deposit()
+        if guess is None or not budget.withdraw():
+            self._count('_skipped' if guess is None else '_budget_denied')
+            value = resolve()
+            return value, generate(value)
+
+        start = time.monotonic()
+        speculated = guess
+        timings = {}
+
+        def timed_generate(value: str) -> T:
+            began = time.monotonic()
+            result = generate(value)
+            timings[value] = time.monotonic() - began
+            return result
+
+        future = self._executor.submit(timed_generate, speculated)
+        try:
+            value = resolve()
+        except Exception:
+            if future.cancel():
+                budget.refund()
+            raise
+        resolve_time = time.monotonic() - start
+
+        if content_words(speculated) == content_words(value):
+            try:
+                result = future.result()
+                logging.info("Speculative generation kept")
+                budget.refund()
+                self._record('_hits', start, resolve_time + timings[speculated])
+                return value, result
+            except Exception as e:
+                logging.error(f"Speculative generation failed: {e}")
+
+        if future.cancel():
+            budget.refund()
+        else:
+            self._count('_wasted_calls')
+        logging.info("Speculative generation discarded")
+        result = timed_generate(value)
+        self._record('_misses', start, resolve_time + timings[value])
+        return value, result
+
+    # ----------------------------------------------------------------------
+    def snapshot(self) -> dict:
+        """
+        Returns the speculation metrics as a dictionary.
+
+        Returns:
+            dict: Hit/miss counts, wasted upstream calls and p99 latency compared
+            with running enhancement and generation one after the other.
+        """
+        with self._lock:
+            data = {
+                'runs': self._runs,
+                'hits': self._hits,
+                'misses': self._misses,
+                'skipped': self._skipped,
+                'budget_denied': self._budget_denied,
+                'wasted_calls': self._wasted_calls,
+                'hit_ratio': self._hits / self._runs if self._runs else 0.0,
+            }
+        serial_p99 = self._serial.percentile(0.99)
+        observed_p99 = self._observed.percentile(0.99)
+        data['serial_p99'] = serial_p99
+        data['observed_p99'] = observed_p99
+        data['p99_saved'] = (
+            serial_p99 - observed_p99 if serial_p99 is not None and observed_p99 is not None else None
+        )
+        return data
+
+    # ----------------------------------------------------------------------
+    def _budget(self, upstream: str) -> HedgeBudget:
+        with self._lock:
+            budget = self._budgets.get(upstream)
+            if budget is None:
+                budget = HedgeBudget(self.policy.budget_ratio, self.policy.budget_burst)
+                self._budgets[upstream] = budget
+            return budget
+
+    # ----------------------------------------------------------------------
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    # ----------------------------------------------------------------------
+    def _record(self, outcome: str, start: float, serial: float) -> None:
+        with self._lock:
+            self._runs += 1
+            setattr(self, outcome, getattr(self, outcome) + 1)
+        self._serial.add(serial)
+        self._observed.add(time.monotonic() - start)
@@ -1,10 +1,12 @@
 import json
 import logging
+import os
 import pprint
-from typing import Any, Dict, List, Literal, Tuple
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 import requests
 
+from core.hedge import Hedger
 from core.remote import Remote
 from openfabric_pysdk.helper import has_resource_fields, json_schema_to_marshmallow, resolve_resources
 from openfabric_pysdk.loader import OutputSchemaInst
@@ -25,20 +27,34 @@ class Stub:
         _schema (Schemas): Stores input/output schemas for each app ID.
         _manifest (Manifests): Stores manifest metadata for each app ID.
         _connections (Connections): Stores active Remote connections for each app ID.
+        _timeout (float): Seconds to wait for each app response.
+        _aliases (Dict[str, str]): Upstream names used for hedging, keyed by app ID.
+        _hedger (Hedger): Sends hedged duplicate requests to slow apps.
     """
 
     # ----------------------------------------------------------------------
-    def __init__(self, app_ids: List[str]):
+    def __init__(self, app_ids: List[str], hedger: Optional[Hedger] = None,
+                 aliases: Optional[Dict[str, str]] = None, timeout: Optional[float] = None):
         """
         Initializes the Stub instance by loading manifests, schemas, and connections
         for each given app ID.
 
         Args:
             app_ids (List[str]): A list of application identifiers (hostnames or URLs).
+            hedger (Optional[Hedger]): Hedging policies and metrics for app calls
+                (default: configured from HEDGE_* environment variables).
+            aliases (Optional[Dict[str, str]]): Upstream names for app IDs, e.g.
+                {"<app-host>": "text_to_image"}, so a default hedger can read
+                HEDGE_<ALIAS>_* overrides. App IDs without an alias use the app ID.
+            timeout (Optional[float]): Seconds to wait for each app response, so abandoned
+                hedged attempts end (default: OPENFABRIC_TIMEOUT, or 120).
         """
         self._schema: Schemas = {}
         self._manifest: Manifests = {}
         self._connections: Connections = {}
+        self._timeout: float = timeout if timeout is not None else float(os.getenv("OPENFABRIC_TIMEOUT", "120"))
+        self._aliases: Dict[str, str] = dict(aliases or {})
+        self._hedger: Hedger = hedger or Hedger.from_env(self._aliases.values())
 
         for app_id in app_ids:
             base_url = app_id.strip('/')
@@ -67,7 +83,8 @@ class Stub:
     # ----------------------------------------------------------------------
     def call(self, app_id: str, data: Any, uid: str = 'super-user') -> dict:
         """
-        Sends a request to the specified app via its Remote connection.
+        Sends a request to the specified app via its Remote connection, hedging it
+        with a duplicate request if the app is slower than usual.
 
         Args:
             app_id (str): The application ID to route the request to.
@@ -85,19 +102,51 @@ class Stub:
             raise Exception(f"Connection not found for app ID: {app_id}")
 
         try:
-            handler = connection.execute(data, uid)
-            result = connection.get_response(handler)
+            upstream = self._aliases.get(app_id, app_id)
+            return self._hedger.call(upstream, self._execute, connection, app_id, data, uid)
+        except Exception as e:
+            logging.error(f"[{app_id}] Execution failed: {e}")
 
-            schema = self.schema(app_id, 'output')
-            marshmallow = json_schema_to_marshmallow(schema)
-            handle_resources = has_resource_fields(marshmallow())
+    # ----------------------------------------------------------------------
+    def hedging_metrics(self) -> Dict[str, dict]:
+        """
+        Retrieves hedging metrics for the apps called so far.
 
-            if handle_resources:
-                result = resolve_resources("https://" + app_id + "/resource?reid={reid}", result, marshmallow())
+        Returns:
+            Dict[str, dict]: Metrics keyed by upstream alias, or by app ID if it has none.
+        """
+        return self._hedger.snapshot()
 
-            return result
-        except Exception as e:
-            logging.error(f"[{app_id}] Execution failed: {e}")
+    # ----------------------------------------------------------------------
+    def _execute(self, connection: Remote, app_id: str, data: Any, uid: str) -> dict:
+        """
+        Performs a single request to an app and resolves resource fields in its output.
+
+        Args:
+            connection (Remote): The connection to the app.
+            app_id (str): The application ID the request is routed to.
+            data (Any): The input data to send to the app.
+            uid (str): The unique user/session identifier for tracking.
+
+        Returns:
+            dict: The output data returned by the app.
+
+        Raises:
+            Exception: If the request failed, timed out or returned no result.
+        """
+        handler = connection.execute(data, uid)
+        result = connection.get_response(handler, self._timeout)
+        if result is None:
+            raise Exception("The request to the proxy app returned no result!")
+
+        schema = self.schema(app_id, 'output')
+        marshmallow = json_schema_to_marshmallow(schema)
+        handle_resources = has_resource_fields(marshmallow())
+
+        if handle_resources:
+            result = resolve_resources("https://" + app_id + "/resource?reid={reid}", result, marshmallow())
+
+        return result
 
     # ----------------------------------------------------------------------
     def manifest(self, app_id: str) -> dict:
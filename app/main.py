@@ -13,6 +13,7 @@ from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from core.llm import openfabric_client
+from core.speculative import SpeculationPolicy, Speculator, normalize_prompt
 
 from ontology_dc8f06af066e4a7880a5938933236037.config import ConfigClass
 from ontology_dc8f06af066e4a7880a5938933236037.input import InputClass
@@ -32,6 +33,9 @@ app = FastAPI(title="AI Creative Partner")
 # Initialize configurations dictionary
 configurations = {}
 
+# Speculative text-to-image generation while the prompt is being enhanced
+speculator = Speculator(SpeculationPolicy.from_env())
+
 # Ollama configuration
 OLLAMA_BASE_URL = "http://localhost:11434"
 OLLAMA_MODEL = "deepseek-coder"  # or "llama2" or any other model you have pulled
@@ -114,15 +118,19 @@ def find_similar_prompt(prompt: str) -> Optional[dict]:
     
     return best_match
 
-def enhance_prompt(prompt: str) -> str:
-    """Enhance the prompt using Ollama LLM."""
+def enhance_prompt(prompt: str, similar: Optional[dict] = None, recalled: bool = False) -> str:
+    """Enhance the prompt using Ollama LLM, building on a similar past request.
+
+    If recalled is True, similar is the caller's memory lookup and memory is not searched again.
+    """
     if not check_ollama_availability():
         logging.error("Ollama server is not running. Please start it using 'ollama serve'")
         return prompt
 
     try:
         # Check if we have a similar prompt in memory
-        similar = find_similar_prompt(prompt)
+        if not recalled:
+            similar = find_similar_prompt(prompt)
         if similar:
             logging.info(f"Found similar prompt in memory: {similar['prompt']}")
             prompt = f"Based on this previous request '{similar['prompt']}', enhance this new request: {prompt}"
@@ -172,6 +180,23 @@ def enhance_prompt(prompt: str) -> str:
         logging.error(f"Error enhancing prompt with Ollama: {e}")
         return prompt
 
+def recall_similar_prompt(prompt: str) -> Optional[dict]:
+    """Find a similar prompt from memory, treating lookup errors as no match."""
+    try:
+        return find_similar_prompt(prompt)
+    except Exception as e:
+        logging.error(f"Error searching memory for a similar prompt: {e}")
+        return None
+
+def speculative_prompt(prompt: str, similar: Optional[dict]) -> Optional[str]:
+    """Pick the cached enhanced prompt to start image generation on, if the request repeats one."""
+    if not similar or not similar['enhanced_prompt']:
+        return None
+    if normalize_prompt(similar['prompt']) != normalize_prompt(prompt):
+        return None
+    logging.info(f"Speculating on cached enhanced prompt: {similar['enhanced_prompt']}")
+    return similar['enhanced_prompt']
+
 ############################################################
 # Config callback function
 ############################################################
@@ -201,17 +226,23 @@ def execute(model: AppModel) -> None:
     request: InputClass = model.request
     prompt = request.prompt
 
-    # Enhance prompt using local LLM
-    enhanced_prompt = enhance_prompt(prompt)
-    logging.info(f"Enhanced prompt: {enhanced_prompt}")
-
     # Retrieve user config
     user_config: ConfigClass = configurations.get('super-user', None)
     logging.info(f"{configurations}")
 
     try:
-        # Step 1: Generate image using Text-to-Image app
-        image_result = openfabric_client.generate_image(enhanced_prompt)
+        # Step 1: Enhance prompt using local LLM and generate image using Text-to-Image app.
+        # In speculative mode, a repeated request starts the image on its cached enhanced
+        # prompt while enhancement runs; memory is then searched once, for both steps.
+        speculating = speculator.policy.enabled
+        similar = recall_similar_prompt(prompt) if speculating else None
+        enhanced_prompt, image_result = speculator.run(
+            "text_to_image",
+            guess=speculative_prompt(prompt, similar),
+            resolve=lambda: enhance_prompt(prompt, similar, recalled=speculating),
+            generate=openfabric_client.generate_image,
+        )
+        logging.info(f"Enhanced prompt: {enhanced_prompt}")
         
         if not image_result or not image_result.image_url:
             raise Exception("Failed to generate image")
@@ -289,6 +320,14 @@ async def generate(request: GenerationRequest):
         logger.error(f"Error during generation: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics/latency")
+async def latency_metrics():
+    """Report p99 latency saved by hedging and speculation versus the extra upstream calls."""
+    return {
+        "hedging": openfabric_client.hedger.snapshot(),
+        "speculation": speculator.snapshot(),
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8888)
\ No newline at end of file
@@ -0,0 +1,150 @@
+import threading
+import time
+
+import pytest
+
+from core.hedge import HedgeBudget, Hedger, HedgePolicy, percentile
+
+
+def policy(**overrides) -> HedgePolicy:
+    settings = dict(enabled=True, initial_delay=0.05, min_delay=0.01, budget_burst=5.0)
+    settings.update(overrides)
+    return HedgePolicy(**settings)
+
+
+def slow_first(delay: float):
+    """Returns a call whose first invocation takes `delay` seconds and later ones return at once."""
+    calls = []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            calls.append(None)
+            first = len(calls) == 1
+        if first:
+            time.sleep(delay)
+            return "primary"
+        return "hedge"
+
+    return call, calls
+
+
+def test_percentile_nearest_rank():
+    assert percentile([], 0.95) is None
+    assert percentile([3.0, 1.0, 2.0], 0.5) == 2.0
+    assert percentile(range(1, 101), 0.95) == 95
+
+
+def test_disabled_policy_calls_inline():
+    hedger = Hedger(HedgePolicy(enabled=False))
+    assert hedger.call("up", lambda: threading.current_thread()) is threading.current_thread()
+    assert hedger.snapshot()["up"]["calls"] == 0
+
+
+def test_hedge_fires_after_delay_and_wins():
+    hedger = Hedger(policy())
+    call, calls = slow_first(0.5)
+
+    assert hedger.call("up", call) == "hedge"
+
+    metrics = hedger.snapshot()["up"]
+    assert len(calls) == 2
+    assert metrics["hedges"] == 1
+    assert metrics["hedge_wins"] == 1
+    # The beaten primary is still running and counts by its elapsed time
+    assert metrics["abandoned_primaries"] == 1
+    assert metrics["p99_saved"] > 0
+
+
+def test_fast_call_is_not_hedged():
+    hedger = Hedger(policy(initial_delay=1.0))
+    assert hedger.call("up", lambda: "ok") == "ok"
+    assert hedger.snapshot()["up"]["hedges"] == 0
+
+
+def test_budget_blocks_hedge():
+    hedger = Hedger(policy(budget_ratio=0.0, budget_burst=0.0))
+    call, calls = slow_first(0.2)
+
+    assert hedger.call("up", call) == "primary"
+
+    metrics = hedger.snapshot()["up"]
+    assert len(calls) == 1
+    assert metrics["hedges"] == 0
+    assert metrics["budget_denied"] == 1
+
+
+def test_budget_limits_hedges_to_ratio():
+    budget = HedgeBudget(ratio=0.5, burst=1.0)
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_all_attempts_failing_reraises():
+    hedger = Hedger(policy())
+
+    def fail():
+        time.sleep(0.1)
+        raise ValueError("upstream down")
+
+    with pytest.raises(ValueError, match="upstream down"):
+        hedger.call("up", fail)
+
+    metrics = hedger.snapshot()["up"]
+    assert metrics["hedges"] == 1
+    assert metrics["failures"] == 1
+
+
+def test_failed_primary_falls_back_to_hedge():
+    hedger = Hedger(policy())
+    calls = []
+
+    def call():
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(0.1)
+            raise ValueError("primary failed")
+        return "hedge"
+
+    assert hedger.call("up", call) == "hedge"
+
+
+def test_full_hedge_pool_does_not_block_primaries():
+    hedger = Hedger(policy(max_hedges_in_flight=1))
+    hang = threading.Event()
+    callers = [threading.Thread(target=hedger.call, args=("stuck", hang.wait), daemon=True)
+               for _ in range(2)]
+    for caller in callers:
+        caller.start()
+    time.sleep(0.2)
+
+    try:
+        for upstream in ("stuck", "healthy"):
+            began = time.monotonic()
+            assert hedger.call(upstream, lambda: "ok") == "ok"
+            assert time.monotonic() - began < 0.5
+        # Only one hedge fits in the pool; the other hung call is refused one
+        stuck = hedger.snapshot()["stuck"]
+        assert stuck["hedges"] == 1
+        assert stuck["saturated"] == 1
+    finally:
+        hang.set()
+
+
+def test_per_upstream_policy_from_env(monkeypatch):
+    monkeypatch.setenv("HEDGE_ENABLED", "true")
+    monkeypatch.setenv("HEDGE_TEXT_TO_IMAGE_PERCENTILE", "0.9")
+    monkeypatch.setenv("HEDGE_TEXT_TO_IMAGE_MAX_HEDGES_IN_FLIGHT", "3")
+
+    hedger = Hedger.from_env(["text_to_image"])
+
+    assert hedger.default_policy.enabled
+    assert hedger.default_policy.percentile == 0.95
+    text_to_image = hedger._policies["text_to_image"]
+    assert text_to_image.enabled
+    assert text_to_image.percentile == 0.9
+    assert text_to_image.max_hedges_in_flight == 3
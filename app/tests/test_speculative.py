@@ -0,0 +1,136 @@
+import threading
+import time
+
+from core.speculative import SpeculationPolicy, Speculator, content_words, normalize_prompt
+
+CACHED = "a red car parked on a wet street at dusk, neon reflections"
+
+
+def recorder():
+    """Returns a generate call that records the prompts it was called with."""
+    prompts = []
+
+    def generate(prompt: str) -> str:
+        prompts.append(prompt)
+        return f"image:{prompt}"
+
+    return generate, prompts
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("  A red\tcar ") == "a red car"
+    assert normalize_prompt("a red car") != normalize_prompt("a blue car")
+
+
+def test_content_words_ignore_case_punctuation_and_stop_words():
+    assert content_words("The red car, at dusk.") == content_words("red car at dusk")
+    assert content_words("a red car") != content_words("a blue car")
+
+
+def test_disabled_runs_serially():
+    speculator = Speculator(SpeculationPolicy(enabled=False))
+    generate, prompts = recorder()
+
+    assert speculator.run("up", CACHED, lambda: "enhanced", generate) == ("enhanced", "image:enhanced")
+    assert prompts == ["enhanced"]
+    assert speculator.snapshot()["runs"] == 0
+
+
+def test_hit_keeps_speculative_result():
+    speculator = Speculator(SpeculationPolicy(enabled=True))
+    generate, prompts = recorder()
+
+    def resolve():
+        time.sleep(0.1)
+        return "A red car, parked on the wet street at dusk with neon reflections."
+
+    value, result = speculator.run("up", CACHED, resolve, generate)
+
+    assert value == resolve()
+    assert result == f"image:{CACHED}"
+
+    metrics = speculator.snapshot()
+    assert prompts == [CACHED]
+    assert metrics["hits"] == 1
+    assert metrics["wasted_calls"] == 0
+
+
+def test_miss_regenerates_and_counts_wasted_call():
+    speculator = Speculator(SpeculationPolicy(enabled=True))
+    generate, prompts = recorder()
+
+    def resolve():
+        time.sleep(0.1)
+        return "a castle on a hill under a stormy sky"
+
+    value, result = speculator.run("up", CACHED, resolve, generate)
+
+    metrics = speculator.snapshot()
+    assert value == "a castle on a hill under a stormy sky"
+    assert result == f"image:{value}"
+    assert prompts == [CACHED, value]
+    assert metrics["misses"] == 1
+    assert metrics["wasted_calls"] == 1
+
+
+def test_one_word_difference_is_a_miss():
+    speculator = Speculator(SpeculationPolicy(enabled=True))
+    generate, prompts = recorder()
+    long_prompt = ("a {} car parked on a wet street at dusk, neon reflections on the hood, "
+                   "cinematic lighting, shallow depth of field, rain drops, moody atmosphere")
+    cached, enhanced = long_prompt.format("blue"), long_prompt.format("red")
+
+    def resolve():
+        time.sleep(0.05)
+        return enhanced
+
+    value, result = speculator.run("up", cached, resolve, generate)
+
+    assert (value, result) == (enhanced, f"image:{enhanced}")
+    assert prompts == [cached, enhanced]
+    assert speculator.snapshot()["misses"] == 1
+
+
+def test_miss_cancels_speculation_that_has_not_started():
+    speculator = Speculator(SpeculationPolicy(enabled=True), max_workers=1)
+    generate, prompts = recorder()
+    release = threading.Event()
+    speculator._executor.submit(release.wait)
+
+    try:
+        value, _ = speculator.run("up", CACHED, lambda: "something else entirely", generate)
+    finally:
+        release.set()
+
+    metrics = speculator.snapshot()
+    assert prompts == [value]
+    assert metrics["misses"] == 1
+    assert metrics["wasted_calls"] == 0
+
+
+def test_no_guess_is_skipped():
+    speculator = Speculator(SpeculationPolicy(enabled=True))
+    generate, prompts = recorder()
+
+    assert speculator.run("up", None, lambda: "enhanced", generate) == ("enhanced", "image:enhanced")
+    assert prompts == ["enhanced"]
+    assert speculator.snapshot()["skipped"] == 1
+
+
+def test_budget_limits_speculative_calls():
+    speculator = Speculator(SpeculationPolicy(enabled=True, budget_ratio=0.0, budget_burst=1.0))
+    generate, prompts = recorder()
+
+    def resolve():
+        time.sleep(0.05)
+        return "unrelated prompt"
+
+    speculator.run("up", CACHED, resolve, generate)
+    speculator.run("up", CACHED, resolve, generate)
+
+    metrics = speculator.snapshot()
+    assert prompts == [CACHED, "unrelated prompt", "unrelated prompt"]
+    assert metrics["budget_denied"] == 1
+    # Budgets are kept per upstream
+    speculator.run("other", CACHED, resolve, generate)
+    assert speculator.snapshot()["budget_denied"] == 1